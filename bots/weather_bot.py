@@ -5,19 +5,87 @@ This bot demonstrates how to make API calls to a weather service
 and format the results for the user.
 """
 
+import asyncio
+import functools
 import json
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Optional, TypedDict, Union, cast
+from types import MappingProxyType
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import httpx
+import orjson
 from fastapi_poe.types import MetaResponse, PartialResponse, QueryRequest
 
 from utils.base_bot import BaseBot, BotError, BotErrorNoRetry
 
 logger = logging.getLogger(__name__)
 
+OPENWEATHER_BASE_URL = "https://api.openweathermap.org"
+
+# Weather changes slowly, so recent lookups are served from memory
+WEATHER_CACHE_TTL_SECONDS = 300.0
+WEATHER_CACHE_MAX_SIZE = 1024
+
+# Command keywords, matched against the stripped, lowercased message
+_BOT_INFO_CMD = "bot info"
+_HELP_CMDS = frozenset({"help", "?", "/help"})
+_LOCATION_CMDS = frozenset({"current location", "my location", "here"})
+# Longer messages cannot be a command, so they skip lowercasing entirely
+_MAX_CMD_LENGTH = max(len(cmd) for cmd in _HELP_CMDS | _LOCATION_CMDS | {_BOT_INFO_CMD})
+
+_HELP_TEXT = """
+## 🌤️ Weather Bot
+
+I can provide weather information for any location around the world.
+
+Just type a city or location name, for example:
+- `New York`
+- `London, UK`
+- `Tokyo`
+- `Paris, France`
+
+I'll give you the current weather conditions, temperature, and more.
+"""
+_EMPTY_QUERY_TEXT = "Please enter a location name. Type 'help' for instructions."
+_GENERIC_LOCATION_TEXT = "Please specify a location by name (e.g., 'New York', 'London, UK')."
+
+# Weather report layout, filled in with str.format_map
+_WEATHER_REPORT_BODY = """\
+**Current Conditions:** {weather_main} ({weather_desc})
+
+### Temperature
+- **Current:** {temp}°C
+- **Feels Like:** {feels_like}°C
+- **Min/Max:** {temp_min}°C / {temp_max}°C
+
+### Additional Info
+- **Humidity:** {humidity}%
+- **Wind Speed:** {wind_speed} m/s
+- **Local Time:** {local_time}
+"""
+_WEATHER_REPORT_TEMPLATE = "## 🌤️ Weather for {location}, {country}\n\n" + _WEATHER_REPORT_BODY
+_MOCK_WEATHER_REPORT_TEMPLATE = """\
+## 🌤️ Weather for {location}
+
+⚠️ **Note:** Using mock data. Set OPENWEATHER_API_KEY for real weather data.
+
+""" + _WEATHER_REPORT_BODY
+
 
 class WeatherCondition(TypedDict):
     """Type definition for a weather condition."""
@@ -76,6 +144,48 @@ class WeatherData(TypedDict, total=False):
     mock_data: bool  # Optional field for mock data
 
 
+class WeatherView(NamedTuple):
+    """The fields of a weather response that are shown to the user."""
+
+    location: str
+    country: str
+    weather_main: str
+    weather_desc: str
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    humidity: int
+    wind_speed: float
+    local_time: str
+    mock_data: bool
+
+
+# Shared read-only default for missing sections of a weather response
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# Constant part of the mock weather data; name, "dt" and "sys" are filled in per call.
+# Mock results are shallow copies that share the nested "main", "weather", "wind" and
+# "clouds" values with this template, so callers must treat them as read-only.
+_MOCK_WEATHER_TEMPLATE: WeatherData = {
+    "main": {
+        "temp": 22.5,
+        "feels_like": 23.0,
+        "temp_min": 20.0,
+        "temp_max": 25.0,
+        "pressure": 1012,
+        "humidity": 65,
+    },
+    "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+    "wind": {"speed": 3.6, "deg": 160},
+    "clouds": {"all": 0},
+    "timezone": 0,
+    "id": 123456,
+    "cod": 200,
+    "mock_data": True,  # Flag to indicate this is mock data
+}
+
+
 class WeatherBot(BaseBot):
     """
     A bot that provides weather information for any location.
@@ -96,11 +206,42 @@ class WeatherBot(BaseBot):
         self.api_key: str = os.environ.get("OPENWEATHER_API_KEY", "")
         if not self.api_key:
             logger.warning("OPENWEATHER_API_KEY not set. Weather data will be mocked.")
+        self._client: Optional[httpx.AsyncClient] = None
+        # Normalized location -> (expiry time, weather data)
+        self._weather_cache: Dict[str, Tuple[float, WeatherData]] = {}
+        # Normalized location -> in-progress lookup shared by concurrent requests
+        self._inflight: Dict[str, "asyncio.Task[WeatherData]"] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client, creating it on first use.
+
+        Reusing one client keeps connections to the weather API alive across requests.
+
+        Returns:
+            The shared httpx.AsyncClient
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=OPENWEATHER_BASE_URL,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=32),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client, if one was created."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _get_weather(self, location: str) -> WeatherData:
         """
         Get weather data for a location.
 
+        Results are cached per normalized location for WEATHER_CACHE_TTL_SECONDS, and
+        concurrent requests for the same location share a single API call.
+
         Args:
             location: The city or location name
 
@@ -114,19 +255,69 @@ class WeatherBot(BaseBot):
         if not self.api_key:
             return self._get_mock_weather(location)
 
+        key: str = location.strip().lower()
+        cached = self._weather_cache.get(key)
+        if cached is not None:
+            expires_at, data = cached
+            if expires_at > time.monotonic():
+                return data
+            del self._weather_cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_weather(location))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._store_weather, key))
+
+        # Shield the shared lookup so one cancelled caller does not cancel the others
+        return await asyncio.shield(task)
+
+    def _store_weather(self, key: str, task: "asyncio.Task[WeatherData]") -> None:
+        """
+        Finish an in-flight lookup, caching its result if it succeeded.
+
+        Runs once per lookup as a task done-callback, so callers sharing the lookup do
+        not each write to the cache.
+
+        Args:
+            key: The normalized location the lookup was for
+            task: The completed lookup task
+        """
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if key not in self._weather_cache and len(self._weather_cache) >= WEATHER_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            self._weather_cache.pop(next(iter(self._weather_cache)))
+        self._weather_cache[key] = (time.monotonic() + WEATHER_CACHE_TTL_SECONDS, task.result())
+
+    async def _fetch_weather(self, location: str) -> WeatherData:
+        """
+        Fetch weather data for a location from the OpenWeatherMap API.
+
+        Args:
+            location: The city or location name
+
+        Returns:
+            Dictionary containing weather data
+
+        Raises:
+            BotErrorNoRetry: If the location is not found
+            BotError: If there is an error accessing the weather API
+        """
         try:
             # Use the OpenWeatherMap API for weather data
-            url: str = "https://api.openweathermap.org/data/2.5/weather"
             params: Dict[str, str] = {
                 "q": location,
                 "appid": self.api_key,
                 "units": "metric",  # Use metric units (Celsius)
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return cast(WeatherData, response.json())
+            response = await self._get_client().get("/data/2.5/weather", params=params)
+            response.raise_for_status()
+            # Parse the raw body bytes directly, skipping the str decode response.json() does
+            return cast(WeatherData, orjson.loads(response.content))
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -145,105 +336,97 @@ class WeatherBot(BaseBot):
             location: The location name to use in the mock data
 
         Returns:
-            Mock weather data
+            Mock weather data; nested sections are shared with the template and must not
+            be mutated
         """
         # Get current timestamp
         current_timestamp: int = int(datetime.now().timestamp())
 
-        return cast(
-            WeatherData,
-            {
-                "name": location,
-                "main": {
-                    "temp": 22.5,
-                    "feels_like": 23.0,
-                    "temp_min": 20.0,
-                    "temp_max": 25.0,
-                    "pressure": 1012,
-                    "humidity": 65,
-                },
-                "weather": [
-                    {"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}
-                ],
-                "wind": {"speed": 3.6, "deg": 160},
-                "clouds": {"all": 0},
-                "sys": {
-                    "country": "Mock",
-                    "sunrise": current_timestamp,
-                    "sunset": current_timestamp + 43200,  # 12 hours later
-                },
-                "dt": current_timestamp,
-                "timezone": 0,
-                "id": 123456,
-                "cod": 200,
-                "mock_data": True,  # Flag to indicate this is mock data
-            },
-        )
-
-    def _format_weather_data(self, weather_data: WeatherData) -> str:
+        data = _MOCK_WEATHER_TEMPLATE.copy()
+        data["name"] = location
+        data["dt"] = current_timestamp
+        data["sys"] = {
+            "country": "Mock",
+            "sunrise": current_timestamp,
+            "sunset": current_timestamp + 43200,  # 12 hours later
+        }
+        return data
+
+    def _parse_weather_data(self, weather_data: WeatherData) -> WeatherView:
         """
-        Format weather data into a readable response.
+        Extract the displayed fields from weather data, applying defaults once.
 
         Args:
             weather_data: Weather data from API or mock
 
         Returns:
-            Formatted weather information
+            The parsed weather fields
         """
         location: str = weather_data.get("name", "Unknown")
-        country: str = weather_data.get("sys", {}).get("country", "")
+        country: str = weather_data.get("sys", _EMPTY).get("country", "")
 
         # Get main weather data
-        main_data: Dict[str, Any] = cast(Dict[str, Any], weather_data.get("main", {}))
-        temp: float = float(main_data.get("temp", 0))
-        feels_like: float = float(main_data.get("feels_like", 0))
-        temp_min: float = float(main_data.get("temp_min", 0))
-        temp_max: float = float(main_data.get("temp_max", 0))
-        humidity: int = int(main_data.get("humidity", 0))
-
-        # Get weather description
-        weather_list = cast(List[Dict[str, Any]], weather_data.get("weather", [{}]))
-        weather_main: str = str(
-            weather_list[0].get("main", "Unknown") if weather_list else "Unknown"
-        )
-        weather_desc: str = str(
-            weather_list[0].get("description", "Unknown") if weather_list else "Unknown"
-        )
+        main_data: Mapping[str, Any] = cast(Mapping[str, Any], weather_data.get("main", _EMPTY))
+        main_get = main_data.get
+        temp: float = float(main_get("temp", 0))
+        feels_like: float = float(main_get("feels_like", 0))
+        temp_min: float = float(main_get("temp_min", 0))
+        temp_max: float = float(main_get("temp_max", 0))
+        humidity: int = int(main_get("humidity", 0))
+
+        # Get weather description from the first condition, if any
+        weather_list = cast(Optional[List[Dict[str, Any]]], weather_data.get("weather"))
+        first_weather: Mapping[str, Any] = weather_list[0] if weather_list else _EMPTY
+        weather_main: str = str(first_weather.get("main", "Unknown"))
+        weather_desc: str = str(first_weather.get("description", "Unknown"))
 
         # Get wind data
-        wind: Dict[str, Any] = cast(Dict[str, Any], weather_data.get("wind", {}))
+        wind: Mapping[str, Any] = cast(Mapping[str, Any], weather_data.get("wind", _EMPTY))
         wind_speed: float = wind.get("speed", 0)
 
         # Get time information
         dt: int = weather_data.get("dt", 0)
         timezone_offset: int = weather_data.get("timezone", 0)
-        local_time: str = datetime.utcfromtimestamp(dt + timezone_offset).strftime(
-            "%Y-%m-%d %H:%M:%S"
+        tm = time.gmtime(dt + timezone_offset)
+        local_time: str = "%04d-%02d-%02d %02d:%02d:%02d" % (
+            tm.tm_year,
+            tm.tm_mon,
+            tm.tm_mday,
+            tm.tm_hour,
+            tm.tm_min,
+            tm.tm_sec,
         )
 
-        # Create response
-        if weather_data.get("mock_data", False):
-            response = f"## 🌤️ Weather for {location}\n\n"
-            response += (
-                "⚠️ **Note:** Using mock data. Set OPENWEATHER_API_KEY for real weather data.\n\n"
-            )
-        else:
-            response = f"## 🌤️ Weather for {location}, {country}\n\n"
+        return WeatherView(
+            location=location,
+            country=country,
+            weather_main=weather_main,
+            weather_desc=weather_desc,
+            temp=temp,
+            feels_like=feels_like,
+            temp_min=temp_min,
+            temp_max=temp_max,
+            humidity=humidity,
+            wind_speed=wind_speed,
+            local_time=local_time,
+            mock_data=bool(weather_data.get("mock_data", False)),
+        )
 
-        # Current conditions
-        response += f"**Current Conditions:** {weather_main} ({weather_desc})\n\n"
-        response += "### Temperature\n"
-        response += f"- **Current:** {temp}°C\n"
-        response += f"- **Feels Like:** {feels_like}°C\n"
-        response += f"- **Min/Max:** {temp_min}°C / {temp_max}°C\n\n"
+    def _format_weather_data(self, weather_data: WeatherData) -> str:
+        """
+        Format weather data into a readable response.
 
-        # Additional information
-        response += "### Additional Info\n"
-        response += f"- **Humidity:** {humidity}%\n"
-        response += f"- **Wind Speed:** {wind_speed} m/s\n"
-        response += f"- **Local Time:** {local_time}\n"
+        Args:
+            weather_data: Weather data from API or mock
 
-        return response
+        Returns:
+            Formatted weather information
+        """
+        view: WeatherView = self._parse_weather_data(weather_data)
+        template: str = (
+            _MOCK_WEATHER_REPORT_TEMPLATE if view.mock_data else _WEATHER_REPORT_TEMPLATE
+        )
+        return template.format_map(view._asdict())
 
     async def get_response(
         self, query: QueryRequest
@@ -264,44 +447,28 @@ class WeatherBot(BaseBot):
             # Log the extracted message
             logger.debug(f"[{self.bot_name}] Received message: {user_message}")
 
+            message: str = user_message.strip()
+            command: str = message.lower() if len(message) <= _MAX_CMD_LENGTH else ""
+
             # Add metadata about the bot if requested
-            if user_message.lower().strip() == "bot info":
+            if command == _BOT_INFO_CMD:
                 metadata: Dict[str, Any] = self._get_bot_metadata()
                 yield PartialResponse(text=json.dumps(metadata, indent=2))
                 return
 
-            message: str = user_message.strip()
-
             # Help command
-            if message.lower() in ["help", "?", "/help"]:
-                help_text: str = """
-## 🌤️ Weather Bot
-
-I can provide weather information for any location around the world.
-
-Just type a city or location name, for example:
-- `New York`
-- `London, UK`
-- `Tokyo`
-- `Paris, France`
-
-I'll give you the current weather conditions, temperature, and more.
-"""
-                yield PartialResponse(text=help_text)
+            if command in _HELP_CMDS:
+                yield PartialResponse(text=_HELP_TEXT)
                 return
 
             # Empty query
             if not message:
-                yield PartialResponse(
-                    text="Please enter a location name. Type 'help' for instructions."
-                )
+                yield PartialResponse(text=_EMPTY_QUERY_TEXT)
                 return
 
             # Check for specific commands/keywords
-            if message.lower() in ["current location", "my location", "here"]:
-                yield PartialResponse(
-                    text="Please specify a location by name (e.g., 'New York', 'London, UK')."
-                )
+            if command in _LOCATION_CMDS:
+                yield PartialResponse(text=_GENERIC_LOCATION_TEXT)
                 return
 
             # Get weather data
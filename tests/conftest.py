@@ -4,6 +4,7 @@ Pytest configuration for the Poe Bots Framework.
 
 import os
 import sys
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -15,6 +16,19 @@ os.environ["POE_ALLOW_WITHOUT_KEY"] = "true"
 os.environ["DEBUG"] = "true"
 
 
+@pytest.fixture(scope="session", autouse=True)
+def mock_genai():
+    """Replace the google.generativeai module with a single mock for the test session."""
+    genai_mock = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "google.generativeai", genai_mock)
+        # "import google.generativeai" resolves through the parent package attribute
+        # when the real module was already imported, so patch that as well
+        if "google" in sys.modules:
+            mp.setattr(sys.modules["google"], "generativeai", genai_mock, raising=False)
+        yield genai_mock
+
+
 @pytest.fixture
 def sample_query():
     """Sample query for testing."""
@@ -3,7 +3,7 @@ Tests for the BotFactory class.
 """
 
 from typing import AsyncGenerator
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Use httpx client directly since we're having compatibility issues
 import httpx
@@ -107,6 +107,19 @@ def test_create_app(factory_bot_classes):
     assert "/test-factory-bot-2" in routes
 
 
+@pytest.mark.asyncio
+async def test_create_app_closes_bots_on_shutdown(factory_bot_classes):
+    """Test that bots with an aclose hook are closed when the app shuts down."""
+    aclose = AsyncMock()
+    closable_bot = type("TestClosableBot", (TestFactoryBot1,), {"aclose": aclose})
+
+    app = BotFactory.create_app([closable_bot, TestFactoryBot2], allow_without_key=True)
+
+    async with app.router.lifespan_context(app):
+        aclose.assert_not_called()
+    aclose.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_app_integration(factory_bot_classes):
     """Test the integration of BotFactory with FastAPI."""
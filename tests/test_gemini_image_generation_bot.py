@@ -2,37 +2,13 @@
 Tests for the GeminiImageGenerationBot that can generate images from text prompts.
 """
 
-import sys
-from typing import Any, cast
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi_poe.types import ProtocolMessage, QueryRequest, SettingsResponse
 
-# Create mock for google.generativeai module and add it to sys.modules before importing the bot
-mock_genai = MagicMock()
-sys.modules["google.generativeai"] = mock_genai
-
-# Local imports must be after the mock setup to avoid import errors
-from bots.gemini import GeminiImageGenerationBot  # noqa: E402
-
-
-class MockResponsePart:
-    """Mock response part for image generation."""
-
-    def __init__(self, inline_data=None, text=None):
-        self.inline_data = inline_data
-        # Make sure text is always a string if provided
-        self.text = str(text) if text is not None else None
-
-
-class MockGenAIResponse:
-    """Mock response for image generation."""
-
-    def __init__(self, parts=None, text=None):
-        self.parts = parts or []
-        # Make sure text is always a string if provided
-        self.text = str(text) if text is not None else None
+from bots.gemini import GeminiImageGenerationBot
 
 
 @pytest.fixture
@@ -99,7 +75,7 @@ async def test_help_request(image_generation_bot):
 
 
 @pytest.mark.asyncio
-async def test_successful_image_generation(image_generation_bot, image_request):
+async def test_successful_image_generation(image_generation_bot, image_request, mock_genai):
     """Test successful image generation workflow."""
     # Mock data
     image_data = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x01"  # Simplified JPEG header
@@ -108,11 +84,11 @@ async def test_successful_image_generation(image_generation_bot, image_request):
     mock_inline_data.data = image_data
 
     # Create mock parts with text and image data
-    text_part = MockResponsePart(text="Here's a cat sitting on a beach")
-    image_part = MockResponsePart(inline_data=mock_inline_data)
+    text_part = SimpleNamespace(inline_data=None, text="Here's a cat sitting on a beach")
+    image_part = SimpleNamespace(inline_data=mock_inline_data, text=None)
 
     # Create mock response with parts
-    mock_response = MockGenAIResponse(
+    mock_response = SimpleNamespace(
         parts=[text_part, image_part], text="Generated image of a cat on the beach"
     )
 
@@ -120,9 +96,8 @@ async def test_successful_image_generation(image_generation_bot, image_request):
     mock_model = MagicMock()
     mock_model.generate_content.return_value = mock_response
 
-    # No need to create a new mock_genai here, we'll use the module-level one
-    mock_genai_module = cast(Any, sys.modules["google.generativeai"])
-    mock_genai_module.configure = MagicMock()
+    # Use the session-wide google.generativeai mock installed by conftest
+    mock_genai.configure = MagicMock()
 
     # Mock for Poe attachment response
     mock_attachment_response = AsyncMock()
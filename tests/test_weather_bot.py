@@ -2,12 +2,16 @@
 Tests for the WeatherBot implementation.
 """
 
+import asyncio
+from typing import cast
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 from fastapi_poe.types import QueryRequest
 
-from bots.weather_bot import WeatherBot
+from bots.weather_bot import _MOCK_WEATHER_TEMPLATE, OPENWEATHER_BASE_URL, SysData, WeatherBot
+from utils.base_bot import BotErrorNoRetry
 
 
 @pytest.fixture
@@ -16,6 +20,26 @@ def weather_bot():
     return WeatherBot()
 
 
+@pytest.fixture
+async def api_weather_bot():
+    """Create WeatherBots backed by a mocked OpenWeather API, closing them on teardown."""
+    bots = []
+
+    def create(handler):
+        with patch.dict("os.environ", {"OPENWEATHER_API_KEY": "test_key"}):
+            bot = WeatherBot()
+        bot._client = httpx.AsyncClient(
+            base_url=OPENWEATHER_BASE_URL, transport=httpx.MockTransport(handler)
+        )
+        bots.append(bot)
+        return bot
+
+    yield create
+
+    for bot in bots:
+        await bot.aclose()
+
+
 @pytest.fixture
 def mock_weather_data():
     """Create mock weather data for testing."""
@@ -115,6 +139,26 @@ async def test_weather_bot_generic_location(weather_bot):
     assert "Please specify a location" in response_text
 
 
+@pytest.mark.asyncio
+async def test_weather_bot_command_case_and_whitespace(weather_bot):
+    """Test that commands match regardless of case and surrounding whitespace."""
+    query = QueryRequest(
+        version="1.0",
+        type="query",
+        query=[{"role": "user", "content": "  Current Location  "}],
+        user_id="test_user",
+        conversation_id="test_conversation",
+        message_id="test_message",
+    )
+
+    responses = []
+    async for response in weather_bot.get_response(query):
+        responses.append(response)
+
+    response_text = " ".join([r.text for r in responses])
+    assert "Please specify a location" in response_text
+
+
 @pytest.mark.asyncio
 async def test_weather_bot_get_weather(weather_bot, mock_weather_data):
     """Test weather bot getting weather data."""
@@ -186,3 +230,141 @@ async def test_format_weather_data(weather_bot, mock_weather_data):
     assert "23.0°C" in formatted_data  # Feels like
     assert "65%" in formatted_data  # Humidity
     assert "3.6 m/s" in formatted_data  # Wind speed
+    assert "2021-04-20 09:20:00" in formatted_data  # Local time
+
+
+def test_parse_weather_data(weather_bot, mock_weather_data):
+    """Test parsing weather data into the displayed fields."""
+    view = weather_bot._parse_weather_data(mock_weather_data)
+
+    assert view.location == "Test City"
+    assert view.country == "TS"
+    assert view.weather_main == "Clear"
+    assert view.weather_desc == "clear sky"
+    assert view.temp == 22.5
+    assert view.humidity == 65
+    assert view.local_time == "2021-04-20 09:20:00"
+    assert view.mock_data is True
+
+    # Missing sections fall back to defaults
+    empty_view = weather_bot._parse_weather_data({})
+    assert empty_view.location == "Unknown"
+    assert empty_view.weather_main == "Unknown"
+    assert empty_view.temp == 0.0
+    assert empty_view.mock_data is False
+    assert weather_bot._parse_weather_data({"weather": []}).weather_desc == "Unknown"
+
+
+@pytest.mark.asyncio
+async def test_get_client_created_lazily(weather_bot):
+    """Test that the shared HTTP client is created on demand and recreated after aclose."""
+    assert weather_bot._client is None
+
+    client = weather_bot._get_client()
+    assert isinstance(client, httpx.AsyncClient)
+    assert client.base_url == httpx.URL(OPENWEATHER_BASE_URL)
+    assert weather_bot._get_client() is client
+
+    await weather_bot.aclose()
+    assert client.is_closed
+    assert weather_bot._client is None
+
+    new_client = weather_bot._get_client()
+    assert new_client is not client
+    assert not new_client.is_closed
+
+    await weather_bot.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_weather_reuses_client(api_weather_bot, mock_weather_data):
+    """Test that API lookups parse the response and share one HTTP client."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=mock_weather_data)
+
+    bot = api_weather_bot(handler)
+    client = bot._get_client()
+
+    assert await bot._get_weather("Test City") == mock_weather_data
+    assert await bot._get_weather("Other City") == mock_weather_data
+    assert bot._get_client() is client
+    assert len(requests) == 2
+    assert requests[0].url.path == "/data/2.5/weather"
+    assert requests[0].url.params["q"] == "Test City"
+
+    await bot.aclose()
+    assert bot._client is None
+
+
+@pytest.mark.asyncio
+async def test_get_weather_location_not_found(api_weather_bot):
+    """Test that a 404 from the weather API raises BotErrorNoRetry."""
+    bot = api_weather_bot(lambda request: httpx.Response(404))
+
+    with pytest.raises(BotErrorNoRetry):
+        await bot._get_weather("Nowhere")
+
+
+@pytest.mark.asyncio
+async def test_get_weather_caches_and_coalesces(api_weather_bot, mock_weather_data):
+    """Test that repeated and concurrent lookups for a location hit the API once."""
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=mock_weather_data)
+
+    bot = api_weather_bot(handler)
+
+    results = await asyncio.gather(*(bot._get_weather("London") for _ in range(5)))
+    assert all(result == mock_weather_data for result in results)
+    assert await bot._get_weather("  london ") == mock_weather_data
+    assert len(requests) == 1
+
+    # Expired entries are fetched again
+    bot._weather_cache["london"] = (0.0, mock_weather_data)
+    await bot._get_weather("London")
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_weather_shared_lookup_evicts_once(api_weather_bot, mock_weather_data):
+    """Test that concurrent callers of one lookup store its result only once."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=mock_weather_data)
+
+    bot = api_weather_bot(handler)
+    with patch("bots.weather_bot.WEATHER_CACHE_MAX_SIZE", 10):
+        for i in range(10):
+            bot._weather_cache[f"c{i}"] = (float("inf"), mock_weather_data)
+
+        await asyncio.gather(*(bot._get_weather("London") for _ in range(5)))
+
+    assert len(bot._weather_cache) == 10
+    assert "c0" not in bot._weather_cache
+    assert "c1" in bot._weather_cache
+    assert "london" in bot._weather_cache
+    assert not bot._inflight
+
+
+def test_get_mock_weather(weather_bot):
+    """Test that mock weather data is built per location without sharing timestamps."""
+    first = weather_bot._get_mock_weather("Paris")
+    second = weather_bot._get_mock_weather("Tokyo")
+
+    assert first["name"] == "Paris"
+    assert second["name"] == "Tokyo"
+    assert first["mock_data"] is True
+    first_sys = cast(SysData, first.get("sys"))
+    assert first_sys["country"] == "Mock"
+    assert first_sys["sunset"] - first_sys["sunrise"] == 43200
+    assert first_sys is not second.get("sys")
+    assert "name" not in _MOCK_WEATHER_TEMPLATE
+    assert "sys" not in _MOCK_WEATHER_TEMPLATE
+    assert "Weather for Paris" in weather_bot._format_weather_data(first)
@@ -1,8 +1,9 @@
+import contextlib
 import importlib
 import inspect
 import logging
 import pkgutil
-from typing import Dict, List, Type
+from typing import Any, AsyncIterator, Dict, List, Type
 
 from fastapi import FastAPI
 from fastapi_poe import PoeBot, make_app
@@ -47,8 +48,36 @@ class BotFactory:
             else:
                 logger.info(f"Created bot: {bot.__class__.__name__}")
 
-        # Create and return the app
-        return make_app(bots, allow_without_key=allow_without_key)
+        # Create the app and release bot resources when it shuts down
+        app = make_app(bots, allow_without_key=allow_without_key)
+        BotFactory._close_bots_on_shutdown(app, bots)
+        return app
+
+    @staticmethod
+    def _close_bots_on_shutdown(app: FastAPI, bots: List[PoeBot]) -> None:
+        """Wrap the app lifespan so bots with an ``aclose`` hook are closed on shutdown.
+
+        Args:
+            app: The FastAPI app serving the bots
+            bots: The bot instances served by the app
+        """
+        original_lifespan = app.router.lifespan_context
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: FastAPI) -> AsyncIterator[Any]:
+            async with original_lifespan(app) as state:
+                yield state
+
+            for bot in bots:
+                aclose = getattr(bot, "aclose", None)
+                if aclose is None:
+                    continue
+                try:
+                    await aclose()
+                except Exception as e:
+                    logger.error(f"Error closing bot {bot.__class__.__name__}: {str(e)}")
+
+        app.router.lifespan_context = lifespan
 
     @staticmethod
     def load_bots_from_module(module_name: str = "bots") -> List[Type[PoeBot]]: